@@ -5,91 +5,368 @@ This module implements the two supported LLM providers:
     - anthropic-claude
 """
 
+import asyncio
+import json
+import random
 from abc import ABC, abstractmethod
-from typing import List, Dict
-import openai
-import requests
+from contextlib import asynccontextmanager
+from typing import List, Dict, Optional
+import httpx
+from aiolimiter import AsyncLimiter
+from openai import APIStatusError, AsyncOpenAI
+from peer_consensus.utils.json_utils import loads
 from peer_consensus.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+DEFAULT_MAX_CONNECTIONS = 200
+DEFAULT_TIMEOUT = 120
+DEFAULT_MAX_CONCURRENCY = 10
+MAX_RETRIES = 5  # Retries after the first attempt on rate-limit, overload and transport errors.
+RETRY_MAX_BACKOFF = 30
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+BATCH_POLL_INTERVAL = 30  # Seconds between status checks of a submitted provider batch.
+
+def build_http_client(max_connections: int = DEFAULT_MAX_CONNECTIONS) -> httpx.AsyncClient:
+    """Build a pooled async HTTP client, meant to be reused for every call of a provider instance."""
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max(1, max_connections // 2),
+    )
+    return httpx.AsyncClient(limits=limits, timeout=DEFAULT_TIMEOUT)
+
+def retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds to wait before retrying after the given (0-based) failed attempt.
+    Honors a numeric Retry-After header, otherwise backs off exponentially with jitter.
+    """
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return min(RETRY_MAX_BACKOFF, 2 ** attempt) + random.uniform(0, 1)
+
+class ProviderThrottle:
+    """Concurrency and request-rate budget shared by every model that uses one provider API key."""
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, rpm: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self._sem = None
+        self._limiter = AsyncLimiter(rpm, 60) if rpm else None
+
+    @asynccontextmanager
+    async def acquire(self, weight: int = 1):
+        """
+        Hold a concurrency slot, and weight rate-limit tokens when rpm is set,
+        for the duration of one provider request.
+        """
+        if self._sem is None:
+            # Created on first use so it binds to the running event loop.
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        async with self._sem:
+            if self._limiter is not None:
+                # A single acquisition cannot exceed the bucket size.
+                await self._limiter.acquire(min(weight, self._limiter.max_rate))
+            yield
+
+# One throttle per (model_provider, api_key), shared by all instances built by get_gpt_implementation.
+_throttles: Dict[tuple, ProviderThrottle] = {}
+
+def get_provider_throttle(model_provider: str, api_key: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                          rpm: Optional[int] = None) -> ProviderThrottle:
+    """Return the throttle for a provider API key, creating it with the given limits on first use."""
+    key = (model_provider, api_key)
+    if key not in _throttles:
+        _throttles[key] = ProviderThrottle(max_concurrency, rpm)
+    return _throttles[key]
+
 class BaseGPT(ABC):
     """Base class for GPT implementations."""
-    def __init__(self, api_key: str, model_name: str):
+    def __init__(self, api_key: str, model_name: str, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 provider_throttle: Optional[ProviderThrottle] = None):
         self.api_key = api_key
         self.model_name = model_name
+        self.max_connections = max_connections
+        self.provider_throttle = provider_throttle or ProviderThrottle()
+
+    def throttle(self, weight: int = 1):
+        """
+        Hold a slot of the throttle shared with every model on this API key for one provider request;
+        weight is the number of completions the request produces.
+        """
+        return self.provider_throttle.acquire(weight)
 
     @abstractmethod
-    def generate_completion(self, messages: List[Dict]) -> str:
-        """Generate a completion from a list of message dicts."""
+    async def agenerate_completion(self, messages: List[Dict]) -> str:
+        """Generate a completion from a list of message dicts without blocking the event loop."""
+        pass
+
+    async def batch_completion(self, list_of_messages: List[List[Dict]]) -> List[str]:
+        """
+        Generate one completion per list of message dicts, in order, in as few requests as the provider allows.
+        The default issues one request per list, concurrently.
+        """
+        return list(await asyncio.gather(*[self.agenerate_completion(messages) for messages in list_of_messages]))
+
+    async def batch_generate(self, list_of_messages: List[List[Dict]]) -> List[str]:
+        """
+        Generate one completion per list of message dicts, in order.
+        The default falls back to batch_completion; providers with a batch endpoint override it.
+        """
+        return await self.batch_completion(list_of_messages)
+
+    async def _complete_missing(self, list_of_messages: List[List[Dict]], results: List[Optional[str]]) -> List[str]:
+        """Send the prompts a provider batch did not answer (None in results) as regular requests."""
+        missing = [i for i, text in enumerate(results) if text is None]
+        if missing:
+            texts = await self.batch_completion([list_of_messages[i] for i in missing])
+            for i, text in zip(missing, texts):
+                results[i] = text
+        return results
+
+    async def aclose(self):
+        """Release any pooled connections held by this instance."""
         pass
 
 class OpenAIGPT(BaseGPT):
     """OpenAI ChatGPT implementation."""
-    def __init__(self, api_key: str, model_name: str):
-        super().__init__(api_key, model_name)
-        openai.api_key = api_key
-
-    def generate_completion(self, messages: List[Dict]) -> str:
-        response = openai.ChatCompletion.create(
-            model=self.model_name,
-            messages=messages,
+    def __init__(self, api_key: str, model_name: str, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 provider_throttle: Optional[ProviderThrottle] = None):
+        super().__init__(api_key, model_name, max_connections, provider_throttle)
+        # The OpenAI client retries 408/409/429/5xx and connection errors itself,
+        # with exponential backoff and jitter that honors Retry-After.
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=build_http_client(max_connections),
+            max_retries=MAX_RETRIES,
         )
-        return response.choices[0]["message"]["content"]
+
+    async def agenerate_completion(self, messages: List[Dict]) -> str:
+        async with self.throttle():
+            response = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+            )
+        return response.choices[0].message.content
+
+    async def batch_completion(self, list_of_messages: List[List[Dict]]) -> List[str]:
+        """
+        Identical prompts (e.g. the opening prompt of a discussion) are served by a single
+        request asking for n choices, weighted as n requests against the key's rate limit;
+        differing prompts fall back to one request each.
+        """
+        if len(list_of_messages) > 1 and all(messages == list_of_messages[0] for messages in list_of_messages[1:]):
+            async with self.throttle(weight=len(list_of_messages)):
+                response = await self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=list_of_messages[0],
+                    n=len(list_of_messages),
+                )
+            return [choice.message.content for choice in sorted(response.choices, key=lambda choice: choice.index)]
+        return await super().batch_completion(list_of_messages)
+
+    async def batch_generate(self, list_of_messages: List[List[Dict]]) -> List[str]:
+        """Submit the prompts through the OpenAI Batch API (/v1/batches) and wait for the results."""
+        if len(list_of_messages) < 2:
+            return await super().batch_generate(list_of_messages)
+        results: List[Optional[str]] = [None] * len(list_of_messages)
+        lines = [
+            json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"model": self.model_name, "messages": messages},
+            })
+            for i, messages in enumerate(list_of_messages)
+        ]
+        try:
+            batch_file = await self.client.files.create(
+                file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch",
+            )
+            batch = await self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+        except APIStatusError as e:
+            # The API answered with an error, so no batch exists and nothing was billed.
+            logger.error("OpenAI batch API rejected the batch, sending the prompts individually: %s", e)
+            return await super().batch_generate(list_of_messages)
+        try:
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                await asyncio.sleep(BATCH_POLL_INTERVAL)
+                batch = await self.client.batches.retrieve(batch.id)
+            output = None
+            if batch.status == "completed" and batch.output_file_id:
+                output = await self.client.files.content(batch.output_file_id)
+        except Exception:
+            logger.error("Lost track of OpenAI batch %s; its results can still be retrieved from the Batch API", batch.id)
+            raise
+        if output is None:
+            logger.error("OpenAI batch %s ended with status %s, sending the prompts individually", batch.id, batch.status)
+            return await super().batch_generate(list_of_messages)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            item = loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") == 200:
+                results[int(item["custom_id"])] = response["body"]["choices"][0]["message"]["content"]
+            else:
+                logger.error("OpenAI batch %s request %s failed, retrying it individually: %s",
+                             batch.id, item.get("custom_id"), item.get("error") or response)
+        return await self._complete_missing(list_of_messages, results)
+
+    async def aclose(self):
+        await self.client.close()
 
 class AnthropicClaudeGPT(BaseGPT):
     """Anthropic Claude GPT implementation."""
     ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
+    ANTHROPIC_BATCHES_URL = "https://api.anthropic.com/v1/messages/batches"
     ANTHROPIC_VERSION = "2023-06-01"
 
-    def __init__(self, api_key: str, model_name: str):
-        super().__init__(api_key, model_name)
+    def __init__(self, api_key: str, model_name: str, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 provider_throttle: Optional[ProviderThrottle] = None):
+        super().__init__(api_key, model_name, max_connections, provider_throttle)
+        self.client = build_http_client(max_connections)
 
-    def generate_completion(self, messages: List[Dict]) -> str:
+    def _headers(self) -> Dict:
+        return {
+            "x-api-key": self.api_key,
+            "anthropic-version": self.ANTHROPIC_VERSION,
+            "Content-Type": "application/json"
+        }
+
+    def _request_body(self, messages: List[Dict]) -> Dict:
         # Format messages into a single prompt string.
         prompt = ""
         for msg in messages:
             role = msg.get("role", "user")
             content = msg.get("content", "")
             prompt += f"\n\n{role.upper()}: {content}"
-        headers = {
-            "x-api-key": self.api_key,
-            "anthropic-version": self.ANTHROPIC_VERSION,
-            "Content-Type": "application/json"
-        }
-        request_body = {
+        return {
             "model": self.model_name,
             "max_tokens": 1024,
             "messages": [{"role": "user", "content": prompt}]
         }
+
+    @staticmethod
+    def _message_text(resp_json: Dict) -> str:
+        """Return the text of the first content block of a Messages API response."""
+        if "content" in resp_json:
+            content_list = resp_json["content"]
+            if isinstance(content_list, list) and len(content_list) > 0:
+                return content_list[0].get("text", "")
+        else:
+            logger.error("Anthropic response missing 'content': %s", resp_json)
+        return ""
+
+    async def _request(self, method: str, url: str, body: Optional[Dict] = None, throttled: bool = False,
+                       retry_unsent_only: bool = False) -> httpx.Response:
+        """
+        Send a request to the Anthropic API, retrying transport errors and retryable
+        status codes (429, 529 overloaded, 5xx) up to MAX_RETRIES times.
+        Throttled requests take a concurrency slot and rate-limit token per attempt.
+        With retry_unsent_only, only failures where the request provably did not run
+        (429 and connection errors) are retried, for calls that must not be repeated.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                if throttled:
+                    async with self.throttle():
+                        response = await self.client.request(method, url, headers=self._headers(), json=body)
+                else:
+                    response = await self.client.request(method, url, headers=self._headers(), json=body)
+            except httpx.TransportError as e:
+                unsent = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if attempt == MAX_RETRIES or (retry_unsent_only and not unsent):
+                    raise
+                delay = retry_delay(attempt)
+                logger.warning("Anthropic request failed (%s); retrying in %.1fs", e, delay)
+            else:
+                retryable = response.status_code == 429 if retry_unsent_only else response.status_code in RETRY_STATUS_CODES
+                if not retryable or attempt == MAX_RETRIES:
+                    return response
+                delay = retry_delay(attempt, response.headers.get("retry-after"))
+                logger.warning("Anthropic API returned %s; retrying in %.1fs", response.status_code, delay)
+            await asyncio.sleep(delay)
+
+    async def agenerate_completion(self, messages: List[Dict]) -> str:
         try:
-            response = requests.post(self.ANTHROPIC_API_URL, headers=headers, json=request_body)
+            response = await self._request("POST", self.ANTHROPIC_API_URL, body=self._request_body(messages), throttled=True)
             if response.status_code == 200:
-                resp_json = response.json()
-                if "content" in resp_json:
-                    content_list = resp_json["content"]
-                    if isinstance(content_list, list) and len(content_list) > 0:
-                        return content_list[0].get("text", "")
-                else:
-                    logger.error("Anthropic response missing 'content': %s", resp_json)
+                # Decode the raw body directly; orjson is used when installed.
+                return self._message_text(loads(response.content))
             else:
                 logger.error("Anthropic API error %s: %s", response.status_code, response.text)
         except Exception as e:
             logger.error("Error during Anthropic request: %s", e)
         return ""
 
-def get_gpt_implementation(api_key: str, model_name: str, model_provider: str) -> BaseGPT:
+    async def batch_generate(self, list_of_messages: List[List[Dict]]) -> List[str]:
+        """Submit the prompts through the Anthropic Message Batches API and wait for the results."""
+        if len(list_of_messages) < 2:
+            return await super().batch_generate(list_of_messages)
+        results: List[Optional[str]] = [None] * len(list_of_messages)
+        request_body = {
+            "requests": [
+                {"custom_id": str(i), "params": self._request_body(messages)}
+                for i, messages in enumerate(list_of_messages)
+            ]
+        }
+        # Creating a batch is not idempotent: a retry after a timeout or 5xx could create a duplicate, billed batch.
+        response = await self._request("POST", self.ANTHROPIC_BATCHES_URL, body=request_body, retry_unsent_only=True)
+        if response.status_code != 200:
+            logger.error("Anthropic batch API error %s, sending the prompts individually: %s", response.status_code, response.text)
+            return await super().batch_generate(list_of_messages)
+        batch = loads(response.content)
+        try:
+            while batch.get("processing_status") != "ended":
+                await asyncio.sleep(BATCH_POLL_INTERVAL)
+                response = await self._request("GET", f"{self.ANTHROPIC_BATCHES_URL}/{batch['id']}")
+                response.raise_for_status()
+                batch = loads(response.content)
+            response = await self._request("GET", batch["results_url"])
+            response.raise_for_status()
+        except Exception:
+            logger.error("Lost track of Anthropic batch %s; its results can still be retrieved from the Message Batches API", batch["id"])
+            raise
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            item = loads(line)
+            result = item.get("result", {})
+            if result.get("type") == "succeeded":
+                results[int(item["custom_id"])] = self._message_text(result["message"])
+            else:
+                logger.error("Anthropic batch %s request %s did not succeed, retrying it individually: %s",
+                             batch["id"], item.get("custom_id"), result)
+        return await self._complete_missing(list_of_messages, results)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+def get_gpt_implementation(api_key: str, model_name: str, model_provider: str,
+                           max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                           max_concurrency: int = DEFAULT_MAX_CONCURRENCY, rpm: Optional[int] = None) -> BaseGPT:
     """
     Factory function to return the appropriate GPT implementation.
+    max_concurrency and rpm bound all requests made with the same provider and API key,
+    across every model built here with that key.
     
     Supported providers:
       - "openai-chatgpt"
       - "anthropic-claude"
     """
     if model_provider == "openai-chatgpt":
-        return OpenAIGPT(api_key, model_name)
+        provider_throttle = get_provider_throttle(model_provider, api_key, max_concurrency, rpm)
+        return OpenAIGPT(api_key, model_name, max_connections, provider_throttle)
     elif model_provider == "anthropic-claude":
-        return AnthropicClaudeGPT(api_key, model_name)
+        provider_throttle = get_provider_throttle(model_provider, api_key, max_concurrency, rpm)
+        return AnthropicClaudeGPT(api_key, model_name, max_connections, provider_throttle)
     else:
         raise ValueError(f"Unsupported model provider: {model_provider}")
 
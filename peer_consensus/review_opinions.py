@@ -10,13 +10,19 @@ and a button to expand the full response.
 
 import os
 import sqlite3
+from pathlib import Path
 import click
 import webbrowser
-from flask import Flask, render_template_string, request, redirect, url_for
+from flask import Flask, request, redirect, url_for
+from werkzeug.serving import is_running_from_reloader
+from peer_consensus.utils.db_manager import decode_response, PREVIEW_CHARS
 
 app = Flask(__name__)
 
-# HTML template using render_template_string for simplicity.
+# Responses already read from each DB: {db_path: (cache_key, responses_list)}.
+_cache = {}
+
+# HTML template kept inline for simplicity; compiled once below.
 HTML_TEMPLATE = """
 <!doctype html>
 <html lang="en">
@@ -34,10 +40,20 @@ HTML_TEMPLATE = """
   <script>
     function toggleResponse(id) {
       var x = document.getElementById(id);
-      if (x.style.display === "none") {
-        x.style.display = "block";
-      } else {
+      if (x.style.display === "block") {
         x.style.display = "none";
+        return;
+      }
+      x.style.display = "block";
+      // The full response is only fetched the first time it is expanded.
+      if (!x.dataset.loaded) {
+        x.textContent = "Loading...";
+        fetch(x.dataset.url)
+          .then(function (r) { return r.text(); })
+          .then(function (text) {
+            x.textContent = text;
+            x.dataset.loaded = "true";
+          });
       }
     }
   </script>
@@ -56,9 +72,8 @@ HTML_TEMPLATE = """
             {{ resp.preview }}
             [ + ]
           </div>
-          <div class="full" id="resp-{{ model_name }}-{{ resp.response_number }}">
-            {{ resp.response }}
-          </div>
+          <div class="full" id="resp-{{ model_name }}-{{ resp.response_number }}"
+               data-url="{{ url_for('response_text', model_name=model_name, response_number=resp.response_number) }}"></div>
         </div>
       {% endfor %}
     </div>
@@ -67,44 +82,96 @@ HTML_TEMPLATE = """
 </html>
 """
 
-def fetch_responses_from_db(db_path: str):
-    """Fetch responses from a SQLite DB and return them as a list of dicts in descending order."""
-    conn = sqlite3.connect(db_path)
+# Compiled once with the app's Jinja environment (autoescaping, url_for) instead of on every request.
+_TEMPLATE = app.jinja_env.from_string(HTML_TEMPLATE)
+
+def connect_readonly(db_path: str) -> sqlite3.Connection:
+    """
+    Open a DB read-only, so reviewing never takes write locks; together with the writer's
+    WAL journaling a session can be reviewed while its discussion is still running.
+    """
+    return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+
+def fetch_responses_from_db(db_path: str, limit: int = -1, offset: int = 0):
+    """
+    Fetch responses from a SQLite DB and return them as a list of dicts in descending order.
+    A negative limit returns every response from offset onwards.
+    """
+    conn = connect_readonly(db_path)
     cursor = conn.cursor()
-    cursor.execute("SELECT response_number, response, convergence, timestamp FROM responses ORDER BY response_number DESC")
-    rows = cursor.fetchall()
-    conn.close()
+    # Only the head of each response is needed for the preview; the full text is served by /response/.
+    # Current sessions store that head in the plain-text preview column next to the compressed response;
+    # older sessions without it hold plain TEXT responses, cut in SQL.
+    columns = {column[1] for column in cursor.execute("PRAGMA table_info(responses)")}
+    head_column = "preview" if "preview" in columns else f"substr(response, 1, {PREVIEW_CHARS})"
+    cursor.execute(
+        f"SELECT response_number, {head_column}, convergence, timestamp FROM responses "
+        "ORDER BY response_number DESC LIMIT ? OFFSET ?",
+        (limit, offset)
+    )
     responses = []
-    for row in rows:
-        response_number, response, convergence, timestamp = row
-        # Create a preview: take the first two non-empty lines (or first 100 characters if less than two lines)
-        lines = [line.strip() for line in response.splitlines() if line.strip()]
-        if len(lines) >= 2:
-            preview = "\n".join(lines[:2])
-        else:
-            preview = response[:100] + ("..." if len(response) > 100 else "")
-        responses.append({
-            "response_number": response_number,
-            "response": response,
-            "convergence": convergence,
-            "timestamp": timestamp,
-            "preview": preview
-        })
+    # Stream rows in chunks rather than materializing the whole result set at once.
+    while True:
+        rows = cursor.fetchmany(100)
+        if not rows:
+            break
+        for row in rows:
+            response_number, head, convergence, timestamp = row
+            # Create a preview: take the first two non-empty lines (or first 100 characters if less than two lines)
+            lines = [line.strip() for line in head.splitlines() if line.strip()]
+            if len(lines) >= 2:
+                preview = "\n".join(lines[:2])
+            else:
+                preview = head[:100] + ("..." if len(head) > 100 else "")
+            responses.append({
+                "response_number": response_number,
+                "convergence": convergence,
+                "timestamp": timestamp,
+                "preview": preview
+            })
+    conn.close()
     return responses
 
-def load_session_data(session_folder: str):
+def fetch_response_text(db_path: str, response_number: int):
+    """Fetch the full text of a single response, or None if it does not exist."""
+    conn = connect_readonly(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT response FROM responses WHERE response_number = ?", (response_number,))
+    row = cursor.fetchone()
+    conn.close()
+    return decode_response(row[0]) if row else None
+
+def _db_cache_key(db_path: str, limit: int, offset: int) -> tuple:
+    """
+    Build a key that changes whenever the DB is written to.
+    With WAL journaling new rows land in the -wal file until a checkpoint, so its mtime counts too.
+    """
+    wal_path = db_path + "-wal"
+    wal_mtime = os.path.getmtime(wal_path) if os.path.exists(wal_path) else None
+    return (os.path.getmtime(db_path), wal_mtime, limit, offset)
+
+def load_session_data(session_folder: str, limit: int = -1, offset: int = 0):
     """
-    Scans the session_folder for *.db files.
+    Scans the session_folder for *.db files (regular files only).
     Returns a dict: {model_name: responses_list}
     where model_name is derived from the file name (without extension).
+    limit and offset page through each model's responses, newest first.
+    DBs that have not changed since the previous call are served from memory.
     """
     data = {}
-    for file in os.listdir(session_folder):
-        if file.endswith(".db"):
-            model_name = os.path.splitext(file)[0]
-            db_path = os.path.join(session_folder, file)
-            responses = fetch_responses_from_db(db_path)
-            data[model_name] = responses
+    with os.scandir(session_folder) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(".db"):
+                model_name = os.path.splitext(entry.name)[0]
+                db_path = entry.path
+                cache_key = _db_cache_key(db_path, limit, offset)
+                cached = _cache.get(db_path)
+                if cached and cached[0] == cache_key:
+                    responses = cached[1]
+                else:
+                    responses = fetch_responses_from_db(db_path, limit, offset)
+                    _cache[db_path] = (cache_key, responses)
+                data[model_name] = responses
     return data
 
 @app.route("/")
@@ -112,8 +179,23 @@ def index():
     session_folder = app.config.get("SESSION_FOLDER")
     if not session_folder or not os.path.exists(session_folder):
         return "Invalid session folder configuration.", 400
-    data = load_session_data(session_folder)
-    return render_template_string(HTML_TEMPLATE, data=data, session_folder=os.path.basename(session_folder))
+    limit = request.args.get("limit", default=-1, type=int)
+    offset = request.args.get("offset", default=0, type=int)
+    data = load_session_data(session_folder, limit, offset)
+    return _TEMPLATE.render(data=data, session_folder=os.path.basename(session_folder))
+
+@app.route("/response/<model_name>/<int:response_number>")
+def response_text(model_name, response_number):
+    session_folder = app.config.get("SESSION_FOLDER")
+    if not session_folder or not os.path.exists(session_folder):
+        return "Invalid session folder configuration.", 400
+    db_path = os.path.join(session_folder, f"{model_name}.db")
+    if not os.path.isfile(db_path):
+        return "Unknown model.", 404
+    response = fetch_response_text(db_path, response_number)
+    if response is None:
+        return "Unknown response.", 404
+    return response, 200, {"Content-Type": "text/plain; charset=utf-8"}
 
 @click.command()
 @click.option("--session-folder", required=True, type=click.Path(exists=True), help="Path to the session folder containing model DB files.")
@@ -122,12 +204,10 @@ def review_opinions(session_folder, port):
     """Launches the review-opinions web UI for a given session folder."""
     app.config["SESSION_FOLDER"] = session_folder
     url = f"http://127.0.0.1:{port}/"
-    # Open the browser after a slight delay
-    import threading, time
-    def open_browser():
-        time.sleep(1)
-        webbrowser.open(url)
-    threading.Thread(target=open_browser).start()
+    # The browser takes longer to start than the server takes to bind, so no delay is needed.
+    # Under the reloader this command runs twice; only the parent process opens a tab.
+    if not is_running_from_reloader():
+        webbrowser.open(url, new=2)
     app.run(host="127.0.0.1", port=port)
 
 if __name__ == "__main__":
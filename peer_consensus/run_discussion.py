@@ -7,24 +7,26 @@ It uses a deterministic proxy that queries multiple LLMs (defined in a config JS
 and iteratively gathers responses until convergence or a maximum number of interactions is reached.
 """
 
-import json
+import asyncio
 import os
 import sys
 from datetime import datetime
 import time
 import click
-import re
 
-from peer_consensus.llm_providers import get_gpt_implementation
+from peer_consensus.llm_providers import get_gpt_implementation, DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_CONCURRENCY
+from peer_consensus.utils.json_utils import loads
 from peer_consensus.utils.logging import get_logger
 from peer_consensus.utils.db_manager import DBManager
-from peer_consensus.utils.convergence import check_convergence
+from peer_consensus.utils.convergence import check_convergence, extract_convergence
 
 logger = get_logger(__name__)
 
+PEER_SUMMARY_CHARS = 500  # Default length bound for each peer opinion quoted in an iterative prompt.
+
 def load_config(config_path: str) -> dict:
-    with open(config_path, "r") as f:
-        return json.load(f)
+    with open(config_path, "rb") as f:
+        return loads(f.read())
 
 def build_initial_prompt(model_name: str, total_models: int, research_prompt: str, convergence_phrase: str) -> list:
     """
@@ -50,6 +52,8 @@ def build_iterative_prompt(model_name: str, own_last_response: str, peer_respons
     It must include exactly the following sentence somewhere in the response:
       'I am in agreement with {percentage}% of the overall opinions given by my peers.'
     The response should remain factual and focused on current scientific evidence without role-playing.
+    peer_responses holds the bounded summaries from summarize_response, so the prompt
+    does not grow with the full length of every peer's answer.
     """
     prompt_text = (
         f"Based on your previous response (shown below) and the latest opinions from your peers, "
@@ -57,22 +61,152 @@ def build_iterative_prompt(model_name: str, own_last_response: str, peer_respons
         "Ensure that your answer is factual, grounded in current scientific research, and focused solely on the topic. "
         f"Include exactly the following sentence somewhere in your response: '{convergence_phrase}'.\n\n"
         f"Your previous answer:\n{own_last_response}\n\n"
-        "Your peers' latest opinions:\n"
+        "Your peers' latest opinions (abridged):\n"
     )
     for peer, response in peer_responses.items():
         prompt_text += f"{peer}: {response}\n"
     return [{"role": "user", "content": prompt_text}]
 
-def extract_convergence(response: str) -> float:
+def summarize_response(response: str, max_chars: int = PEER_SUMMARY_CHARS) -> str:
+    """
+    Return a bounded snippet of a response for quoting to peers:
+    the response itself if short enough, else its first max_chars cut at a word boundary.
+    """
+    if len(response) <= max_chars:
+        return response
+    snippet = response[:max_chars]
+    if " " in snippet:
+        snippet = snippet.rsplit(" ", 1)[0]
+    return snippet.rstrip() + "..."
+
+def group_models(gpt_models: dict) -> list:
     """
-    Extracts the convergence percentage from the response text.
-    Expects a line exactly: 
-    "I am in agreement with {number}% of the overall opinions given by my peers."
+    Group model names whose requests can share a provider request or batch:
+    same implementation, API key and model version. Config order is preserved.
     """
-    match = re.search(r"I am in agreement with (\d+(?:\.\d+)?)% of the overall opinions given by my peers\.", response)
-    if match:
-        return float(match.group(1))
-    return 0.0
+    groups = {}
+    for model_name, gpt_instance in gpt_models.items():
+        key = (type(gpt_instance), gpt_instance.api_key, gpt_instance.model_name)
+        groups.setdefault(key, []).append(model_name)
+    return list(groups.values())
+
+async def record_response(response_text: str, db_manager: DBManager, interaction: int) -> tuple:
+    """
+    Extract the convergence of a response and save it in the model's DB.
+    Returns (response_text, convergence).
+    """
+    convergence_val = extract_convergence(response_text)
+
+    # Save response in corresponding DB while peers are still in flight; committed per interaction.
+    await db_manager.insert_response(interaction, response_text, convergence_val)
+    return response_text, convergence_val
+
+async def query_one(model_name: str, gpt_instance, messages: list, db_manager: DBManager, interaction: int) -> tuple:
+    """
+    Query a single model; run concurrently with its peers via asyncio.gather.
+    Returns (response_text, convergence).
+    """
+    click.echo(f"Querying model {model_name}...")
+    response_text = await gpt_instance.agenerate_completion(messages)
+    return await record_response(response_text, db_manager, interaction)
+
+async def query_group(model_names: list, gpt_models: dict, prompts: dict, db_managers: dict, interaction: int,
+                      use_batch_api: bool = False) -> dict:
+    """
+    Query models sharing provider, API key and version with as few provider requests as possible,
+    or through the provider's Batch API when use_batch_api is set.
+    Returns {model_name: (response_text, convergence)}.
+    """
+    if len(model_names) == 1:
+        model_name = model_names[0]
+        return {model_name: await query_one(
+            model_name, gpt_models[model_name], prompts[model_name], db_managers[model_name], interaction
+        )}
+    click.echo(f"Querying models {', '.join(model_names)} together...")
+    gpt_instance = gpt_models[model_names[0]]
+    list_of_messages = [prompts[name] for name in model_names]
+    if use_batch_api:
+        texts = await gpt_instance.batch_generate(list_of_messages)
+    else:
+        texts = await gpt_instance.batch_completion(list_of_messages)
+    results = {}
+    for model_name, response_text in zip(model_names, texts):
+        results[model_name] = await record_response(response_text, db_managers[model_name], interaction)
+    return results
+
+async def run_interactions(gpt_models: dict, db_managers: dict, max_interactions: int, research_prompt: str,
+                           convergence_phrase: str, convergence_threshold: float, use_batch_api: bool = False,
+                           peer_summary_chars: int = PEER_SUMMARY_CHARS):
+    """
+    Run the interaction loop.
+    Within an interaction every prompt depends only on the previous round's responses,
+    so all models are queried concurrently and their responses committed once per interaction.
+    Models that share provider, API key and version are dispatched together
+    (through one provider batch with use_batch_api).
+    """
+    total_models = len(gpt_models)
+    latest_responses = {}  # Store the latest response from each model.
+    latest_summaries = {}  # Bounded summary of each latest response, computed once and quoted to peers.
+    latest_convergence = {}  # Convergence parsed from each latest response, so it is extracted only once.
+    model_groups = group_models(gpt_models)
+
+    for interaction in range(1, max_interactions + 1):
+        click.echo(f"\n--- Interaction {interaction} ---")
+        prompts = {}
+        for model_name in gpt_models.keys():
+            if interaction == 1:
+                prompts[model_name] = build_initial_prompt(model_name, total_models, research_prompt, convergence_phrase)
+            else:
+                own_last = latest_responses.get(model_name, "")
+                # Prepare peer responses: exclude the current model.
+                peer_responses = {name: summary for name, summary in latest_summaries.items() if name != model_name}
+                prompts[model_name] = build_iterative_prompt(model_name, own_last, peer_responses, convergence_phrase)
+
+        group_results = await asyncio.gather(*[
+            query_group(model_names, gpt_models, prompts, db_managers, interaction, use_batch_api)
+            for model_names in model_groups
+        ])
+        results = {}
+        for group_result in group_results:
+            results.update(group_result)
+        await asyncio.gather(*[db_manager.commit() for db_manager in db_managers.values()])
+
+        for model_name in gpt_models.keys():
+            response_text, convergence_val = results[model_name]
+            click.echo(f"Response from {model_name}:\n{response_text}\n")
+            latest_responses[model_name] = response_text
+            latest_summaries[model_name] = summarize_response(response_text, peer_summary_chars)
+            latest_convergence[model_name] = convergence_val
+
+        # Check overall convergence across models.
+        converged, avg_convergence = check_convergence(latest_convergence, convergence_threshold)
+        click.echo(f"Average convergence after interaction {interaction}: {avg_convergence}%")
+        if converged:
+            click.echo("Consensus achieved. Stopping discussion.")
+            break
+
+async def discuss(gpt_models: dict, session_folder: str, max_interactions: int, research_prompt: str,
+                  convergence_phrase: str, convergence_threshold: float, use_batch_api: bool = False,
+                  peer_summary_chars: int = PEER_SUMMARY_CHARS):
+    """
+    Open a SQLite DB for each model, run the interaction loop,
+    then close the DBs and release the pooled connections held by every model.
+    """
+    db_managers = {}
+    try:
+        for model_name in gpt_models.keys():
+            db_path = os.path.join(session_folder, f"{model_name}.db")
+            db_managers[model_name] = DBManager(db_path)
+            await db_managers[model_name].connect()
+            await db_managers[model_name].initialize_table()
+
+        await run_interactions(
+            gpt_models, db_managers, max_interactions, research_prompt,
+            convergence_phrase, convergence_threshold, use_batch_api, peer_summary_chars
+        )
+    finally:
+        await asyncio.gather(*[db_manager.close() for db_manager in db_managers.values()])
+        await asyncio.gather(*[gpt_instance.aclose() for gpt_instance in gpt_models.values()])
 
 @click.command()
 @click.option("--config", required=True, type=click.Path(exists=True), help="Path to configuration JSON file.")
@@ -87,6 +221,9 @@ def run_discussion(config, prompt_title, max_interactions, research_prompt):
     config_data = load_config(config)
     responses_folder_path = config_data.get("responses_folder_path", "responses")
     convergence_threshold = config_data.get("convergenceThreshold", 90)  # default to 90%
+    use_batch_api = config_data.get("use_batch_api", False)
+    peer_summary_chars = config_data.get("peer_summary_chars", PEER_SUMMARY_CHARS)
+    rate_limits = config_data.get("rate_limits", {})  # {model_provider: {"max_concurrency": ..., "rpm": ...}}
 
     models_config = config_data.get("models", [])
     total_models = len(models_config)
@@ -98,11 +235,15 @@ def run_discussion(config, prompt_title, max_interactions, research_prompt):
     gpt_models = {}
     for model_cfg in models_config:
         provider = model_cfg.get("model_provider")
+        provider_limits = rate_limits.get(provider, {})
         try:
             instance = get_gpt_implementation(
                 api_key=model_cfg["api_key"],
                 model_name=model_cfg["version"],
-                model_provider=provider
+                model_provider=provider,
+                max_connections=model_cfg.get("max_connections", DEFAULT_MAX_CONNECTIONS),
+                max_concurrency=provider_limits.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+                rpm=provider_limits.get("rpm")
             )
             gpt_models[model_cfg["name"]] = instance
         except Exception as e:
@@ -114,48 +255,16 @@ def run_discussion(config, prompt_title, max_interactions, research_prompt):
     session_folder = os.path.join(responses_folder_path, f"{prompt_title} - {timestamp}")
     os.makedirs(session_folder, exist_ok=True)
 
-    # Initialize a SQLite DB for each model using DBManager.
-    db_managers = {}
-    for model_name in gpt_models.keys():
-        db_path = os.path.join(session_folder, f"{model_name}.db")
-        db_managers[model_name] = DBManager(db_path)
-        db_managers[model_name].initialize_table()
-
     # Define the required convergence phrase that each model must include.
     required_convergence_phrase = "I am in agreement with {percentage}% of the overall opinions given by my peers."
 
-    latest_responses = {}  # Store the latest response from each model.
-    
     click.echo(f"Starting discussion with {total_models} models. Max interactions: {max_interactions}")
     click.echo(f"Session folder: {session_folder}")
-    
-    # Interaction loop.
-    for interaction in range(1, max_interactions + 1):
-        click.echo(f"\n--- Interaction {interaction} ---")
-        for model_name, gpt_instance in gpt_models.items():
-            if interaction == 1:
-                messages = build_initial_prompt(model_name, total_models, research_prompt, required_convergence_phrase)
-            else:
-                own_last = latest_responses.get(model_name, "")
-                # Prepare peer responses: exclude the current model.
-                peer_responses = {name: resp for name, resp in latest_responses.items() if name != model_name}
-                messages = build_iterative_prompt(model_name, own_last, peer_responses, required_convergence_phrase)
-            
-            click.echo(f"Querying model {model_name}...")
-            response_text = gpt_instance.generate_completion(messages)
-            click.echo(f"Response from {model_name}:\n{response_text}\n")
-            convergence_val = extract_convergence(response_text)
-            
-            # Save response in corresponding DB.
-            db_managers[model_name].insert_response(interaction, response_text, convergence_val)
-            latest_responses[model_name] = response_text
-        
-        # Check overall convergence across models.
-        converged, avg_convergence = check_convergence(latest_responses, convergence_threshold)
-        click.echo(f"Average convergence after interaction {interaction}: {avg_convergence}%")
-        if converged:
-            click.echo("Consensus achieved. Stopping discussion.")
-            break
+
+    asyncio.run(discuss(
+        gpt_models, session_folder, max_interactions, research_prompt,
+        required_convergence_phrase, convergence_threshold, use_batch_api, peer_summary_chars
+    ))
 
     click.echo("Discussion complete.")
     click.echo(f"Run the following command to review the conversation:")
@@ -1,35 +1,81 @@
 import sqlite3
+import zlib
+import aiosqlite
 from datetime import datetime
+from peer_consensus.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+PREVIEW_CHARS = 200  # Length of the plain-text head stored next to each compressed response.
+
+def encode_response(response: str) -> bytes:
+    """Compress a response for storage; LLM prose typically shrinks 3-4x under zlib."""
+    return zlib.compress(response.encode("utf-8"))
+
+def decode_response(value) -> str:
+    """
+    Decode a stored response. Sessions written before compression hold plain TEXT,
+    which is returned as is.
+    """
+    if isinstance(value, str):
+        return value
+    return zlib.decompress(value).decode("utf-8")
 
 class DBManager:
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
+        self.conn = None
+
+    async def connect(self):
+        # Autocommit mode: transactions are opened explicitly in insert_response and closed in commit().
+        self.conn = await aiosqlite.connect(self.db_path, isolation_level=None)
+        # WAL lets review-opinions read while a discussion is writing; NORMAL skips the per-commit fsync of the WAL.
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
+        await self.conn.execute("PRAGMA temp_store=MEMORY")
 
-    def initialize_table(self):
-        self.cursor.execute('''
+    async def initialize_table(self):
+        await self.conn.execute('''
             CREATE TABLE IF NOT EXISTS responses (
                 response_number INTEGER PRIMARY KEY,
-                response TEXT NOT NULL,
+                response BLOB NOT NULL,
+                preview TEXT NOT NULL,
                 convergence REAL NOT NULL,
                 timestamp TEXT NOT NULL
             )
         ''')
-        self.conn.commit()
 
-    def insert_response(self, response_number: int, response: str, convergence: float):
+    async def insert_response(self, response_number: int, response: str, convergence: float):
+        """Insert a response; it becomes durable on the next commit()."""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.cursor.execute('''
-            INSERT INTO responses (response_number, response, convergence, timestamp)
-            VALUES (?, ?, ?, ?)
-        ''', (response_number, response, convergence, timestamp))
-        self.conn.commit()
+        if not self.conn.in_transaction:
+            await self.conn.execute("BEGIN")
+        await self.conn.execute('''
+            INSERT INTO responses (response_number, response, preview, convergence, timestamp)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (response_number, encode_response(response), response[:PREVIEW_CHARS], convergence, timestamp))
 
-    def get_all_responses(self):
-        self.cursor.execute('SELECT * FROM responses ORDER BY response_number ASC')
-        return self.cursor.fetchall()
+    async def commit(self):
+        if self.conn.in_transaction:
+            await self.conn.execute("COMMIT")
 
-    def close(self):
-        self.conn.close()
+    async def get_all_responses(self):
+        async with self.conn.execute(
+            'SELECT response_number, response, convergence, timestamp FROM responses ORDER BY response_number ASC'
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [(response_number, decode_response(response), convergence, timestamp)
+                for response_number, response, convergence, timestamp in rows]
 
+    async def close(self):
+        """
+        Commit any pending rows and switch the finished session back to a rollback journal,
+        so read-only reviewers need no -wal/-shm files next to it.
+        """
+        await self.commit()
+        try:
+            await self.conn.execute("PRAGMA journal_mode=DELETE")
+        except sqlite3.OperationalError as e:
+            # Leaving WAL needs exclusive access; a reviewer still reading the session keeps it in WAL.
+            logger.warning("Could not leave WAL mode for %s: %s", self.db_path, e)
+        await self.conn.close()
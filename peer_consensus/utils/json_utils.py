@@ -0,0 +1,15 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional: pip install peer-consensus[fast-json]
+    orjson = None
+
+def loads(data):
+    """
+    Decodes JSON from str or bytes, using orjson when it is installed
+    and falling back to the standard library otherwise.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)